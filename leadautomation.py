@@ -1,14 +1,15 @@
 """
-Streamlit Lead Qualification & Proposal — Local-Only (No DB, No API Keys)
-=======================================================================
-- No databases: leads persist to a local JSON file.
+Streamlit Lead Qualification & Proposal — Local-Only (No DB Server, No API Keys)
+================================================================================
+- No database server: leads persist to a local SQLite file (single-row upserts).
 - No external APIs: emails saved to disk, notifications to a log, calls simulated as files.
 - LLM via local Ollama + Gemma 3 (fallback template if Ollama not running).
 
 Run
 ---
 1) Install deps:
-   pip install streamlit pandas langchain langchain-community
+   pip install streamlit pandas orjson langchain langchain-community httpx
+   (httpx is optional: without it, "Draft Proposals for Qualified" generates one proposal at a time)
 2) Ensure Ollama is installed and model pulled:
    ollama pull gemma3
 3) Start app:
@@ -16,20 +17,30 @@ Run
 
 Folders created on first run
 ----------------------------
-- data/leads.json                 — persisted leads
+- data/leads.db                   — persisted leads (SQLite; legacy data/leads.json is imported once)
 - outbox/emails/                  — saved "emails" (markdown)
-- outbox/call_requests/           — simulated outbound call requests (json)
+- outbox/call_requests/           — simulated outbound call requests (json; bulk runs as jsonl)
 - outbox/notifications.log        — notifications log
 - proposals/                      — generated proposals (markdown)
 """
 from __future__ import annotations
 import os
-import csv
-import json
+import asyncio
+import atexit
+import hashlib
+import re
+import time
+import queue
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional
 
+import numpy as np
+import orjson
 import pandas as pd
 import streamlit as st
 
@@ -41,6 +52,12 @@ try:
 except Exception:
     LLM_AVAILABLE = False
 
+# Optional async HTTP client for drafting many proposals concurrently
+try:
+    import httpx
+except Exception:
+    httpx = None
+
 APP_ROOT = Path(__file__).parent
 DATA_DIR = APP_ROOT / "data"
 OUTBOX_DIR = APP_ROOT / "outbox"
@@ -52,7 +69,12 @@ PROPOSALS_DIR = APP_ROOT / "proposals"
 for p in [DATA_DIR, EMAIL_DIR, CALL_REQ_DIR, PROPOSALS_DIR]:
     p.mkdir(parents=True, exist_ok=True)
 
-LEADS_JSON = DATA_DIR / "leads.json"
+LEADS_DB = DATA_DIR / "leads.db"
+LEADS_JSON = DATA_DIR / "leads.json"  # legacy store, imported into LEADS_DB on first run
+
+WRITE_BUFFER = 128 * 1024  # append-heavy / bulk outputs; default 8 KiB is too small
+
+LEAD_COLUMNS = ["Name","Email","Company","UseCase","Budget","Phone","Status","ProposalPath","CallTranscript","LastActionAt","Notes"]
 
 DEFAULT_SETTINGS = {
     "OLLAMA_MODEL": "gemma3",
@@ -60,6 +82,9 @@ DEFAULT_SETTINGS = {
     "QUAL_THRESHOLD": 10000.0,
 }
 
+# Gemma on a single local GPU gains little beyond a few in-flight requests.
+OLLAMA_CONCURRENCY = 4
+
 # -----------------------------
 # Utilities
 # -----------------------------
@@ -68,46 +93,466 @@ def now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
 
+_TS_CACHE: List[Any] = [0, ""]
+
+
+def file_ts() -> str:
+    """Local `YYYYmmdd_HHMMSS_<ns>` for file names; strftime runs at most once per second."""
+    ns = time.time_ns()
+    sec, frac = divmod(ns, 10**9)
+    c = _TS_CACHE
+    if sec != c[0]:
+        c[0], c[1] = sec, time.strftime("%Y%m%d_%H%M%S", time.localtime(sec))
+    return f"{c[1]}_{frac:09d}"
+
+
+@st.cache_resource(show_spinner=False)
+def _notif_fp():
+    # Opened once per server process (module globals are reset on every rerun).
+    fp = open(NOTIF_LOG, "ab", buffering=WRITE_BUFFER)
+    atexit.register(fp.close)
+    return fp
+
+
+class OutboxWriter:
+    """Writes outbox files on a daemon thread so handlers don't wait on disk.
+
+    Only the newest bytes per queued path are kept, so superseded writes are dropped.
+    Failures are held per path until the session that queued the write reports them
+    (see report_write_errors); wait() blocks on one path, for the Outbox Viewer.
+    """
+
+    def __init__(self):
+        self._q: "queue.Queue[Path]" = queue.Queue()
+        self._pending: Dict[Path, bytes] = {}
+        self._busy: set = set()
+        self._failed: Dict[Path, str] = {}
+        self._cond = threading.Condition()
+        threading.Thread(target=self._work, name="outbox-writer", daemon=True).start()
+        atexit.register(self.wait_all)
+
+    def _work(self):
+        while True:
+            path = self._q.get()
+            with self._cond:
+                data = self._pending.pop(path, None)
+                if data is None:
+                    continue
+                self._busy.add(path)
+            err = None
+            try:
+                path.write_bytes(data)
+            except Exception as e:
+                err = f"{type(e).__name__}: {e}"
+            with self._cond:
+                self._busy.discard(path)
+                if err:
+                    self._failed[path] = err
+                self._cond.notify_all()
+
+    def _in_flight(self, path: Path) -> bool:
+        return path in self._pending or path in self._busy
+
+    def submit(self, path: Path, data: bytes):
+        with self._cond:
+            queued = path in self._pending
+            self._pending[path] = data
+            self._failed.pop(path, None)
+        if not queued:
+            self._q.put(path)
+
+    def wait(self, path: Path, timeout: float = 10.0) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._in_flight(path), timeout)
+
+    def wait_all(self, timeout: float = 10.0) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def result(self, path: Path):
+        """(finished, error) for `path`; a reported error is cleared."""
+        with self._cond:
+            if self._in_flight(path):
+                return False, None
+            return True, self._failed.pop(path, None)
+
+
+@st.cache_resource(show_spinner=False)
+def _outbox_writer() -> OutboxWriter:
+    # One writer thread per server process (module globals are reset on every rerun).
+    return OutboxWriter()
+
+
+def write_async(path: Path, data: bytes) -> str:
+    """Queue `data` for `path` and return the path immediately."""
+    _outbox_writer().submit(path, data)
+    st.session_state.setdefault("pending_writes", set()).add(path)
+    return str(path)
+
+
+def wait_for_write(path: Path):
+    """Block until any queued write of `path` has finished (used before showing it)."""
+    _outbox_writer().wait(path)
+
+
+def report_write_errors():
+    """Show this session's failed background writes; finished writes are forgotten."""
+    pending = st.session_state.get("pending_writes")
+    if not pending:
+        return
+    writer = _outbox_writer()
+    for path in list(pending):
+        finished, err = writer.result(path)
+        if finished:
+            pending.discard(path)
+            if err:
+                st.error(f"Could not write {path}: {err}")
+
+
+def flush_notifications():
+    # Called at script-run boundaries (and before the log is shown), not per notify().
+    _notif_fp().flush()
+
+
+_NOTIFY_BATCH: Optional[List[str]] = None
+
+
 def notify(msg: str):
     line = f"{now_iso()} | {msg}\n"
-    with open(NOTIF_LOG, "a", encoding="utf-8") as f:
-        f.write(line)
+    if _NOTIFY_BATCH is not None:
+        _NOTIFY_BATCH.append(line)
+        return
+    _notif_fp().write(line.encode("utf-8"))
     st.toast(msg)
 
 
-def load_leads() -> List[Dict[str, Any]]:
-    if not LEADS_JSON.exists():
-        return []
+@contextmanager
+def notify_batch() -> Iterator[List[str]]:
+    """Collect notify() lines and append them to NOTIF_LOG with a single write."""
+    global _NOTIFY_BATCH
+    batch: List[str] = []
+    outer, _NOTIFY_BATCH = _NOTIFY_BATCH, batch
+    try:
+        yield batch
+    finally:
+        _NOTIFY_BATCH = outer
+        if batch:
+            _notif_fp().write("".join(batch).encode("utf-8"))
+            last = batch[-1].split(" | ", 1)[1].rstrip("\n")
+            st.toast(last if len(batch) == 1 else f"{len(batch)} notifications logged (last: {last})")
+
+
+def email_key(email: Optional[str]) -> str:
+    """Canonical lead key: trimmed, lowercased email."""
+    return (email or "").strip().lower()
+
+
+def to_budget(value: Any) -> float:
+    """Budget as a float; blanks and unparseable values (legacy leads.json) become NaN."""
+    if isinstance(value, (int, float)):
+        return float(value)
     try:
-        return json.loads(LEADS_JSON.read_text(encoding="utf-8"))
+        return float(str(value).replace("$", "").replace(",", ""))
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def lead_key(lead: Dict[str, Any]) -> str:
+    # `_email_key` is stored at ingest (upsert_lead, CSV import, DB load); compute only as a fallback.
+    return lead.get("_email_key") or email_key(lead.get("Email"))
+
+
+_UPSERT_SQL = (
+    f"INSERT INTO leads (email_lower, {', '.join(LEAD_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * (len(LEAD_COLUMNS) + 1))}) "
+    f"ON CONFLICT(email_lower) DO UPDATE SET {', '.join(f'{c}=excluded.{c}' for c in LEAD_COLUMNS)}"
+)
+
+
+def _lead_row(lead: Dict[str, Any]) -> tuple:
+    budget = to_budget(lead.get("Budget"))
+    row = {**lead, "Budget": None if np.isnan(budget) else budget}
+    return (lead_key(lead), *(row.get(c) for c in LEAD_COLUMNS))
+
+
+def open_db() -> sqlite3.Connection:
+    # Autocommit; multi-row work is grouped explicitly with leads_transaction().
+    conn = sqlite3.connect(LEADS_DB, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS leads (email_lower TEXT NOT NULL, "
+        + ", ".join(f"{c} {'REAL' if c == 'Budget' else 'TEXT'}" for c in LEAD_COLUMNS)
+        + ")"
+    )
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_email ON leads(email_lower)")
+    if LEADS_JSON.exists() and conn.execute("SELECT 1 FROM leads LIMIT 1").fetchone() is None:
+        try:
+            legacy = orjson.loads(LEADS_JSON.read_bytes())
+        except Exception:
+            legacy = []
+        with leads_transaction(conn):
+            conn.executemany(_UPSERT_SQL, [_lead_row(l) for l in legacy if lead_key(l)])
+    return conn
+
+
+def get_db() -> sqlite3.Connection:
+    if "db" not in st.session_state:
+        st.session_state.db = open_db()
+    return st.session_state.db
+
+
+@contextmanager
+def leads_transaction(conn: Optional[sqlite3.Connection] = None) -> Iterator[sqlite3.Connection]:
+    conn = conn or get_db()
+    conn.execute("BEGIN")
+    try:
+        yield conn
     except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def load_leads() -> List[Dict[str, Any]]:
+    try:
+        cur = get_db().execute(f"SELECT email_lower AS _email_key, {', '.join(LEAD_COLUMNS)} FROM leads ORDER BY rowid")
+    except sqlite3.Error:
         return []
+    leads = [{k: v for k, v in zip(row.keys(), row) if v is not None} for row in cur]
+    st.session_state.saved_rows = {row[0]: hash(row) for row in map(_lead_row, leads)}
+    return leads
+
+
+def _bump_leads_rev():
+    # Every mutation is persisted through save_lead(s), so this is the one place
+    # that invalidates the cached table (see leads_df).
+    st.session_state.leads_rev = st.session_state.get("leads_rev", 0) + 1
+
+
+def _changed_rows(leads: Iterable[Dict[str, Any]]) -> List[tuple]:
+    """Rows that differ from what this session last persisted (by row hash)."""
+    saved = st.session_state.setdefault("saved_rows", {})
+    return [row for row in map(_lead_row, leads) if row[0] and saved.get(row[0]) != hash(row)]
+
+
+def _mark_saved(rows: List[tuple]):
+    saved = st.session_state.saved_rows
+    for row in rows:
+        saved[row[0]] = hash(row)
+    _bump_leads_rev()
+
+
+def save_lead(lead: Dict[str, Any]):
+    rows = _changed_rows([lead])
+    if rows:
+        get_db().execute(_UPSERT_SQL, rows[0])
+        _mark_saved(rows)
+
+
+def save_leads(leads: Iterable[Dict[str, Any]]):
+    rows = _changed_rows(leads)
+    if not rows:
+        return  # nothing changed: no transaction, no cache invalidation
+    with leads_transaction() as conn:
+        conn.executemany(_UPSERT_SQL, rows)
+    _mark_saved(rows)
+
+
+class LeadTable:
+    """Leads kept column-wise (struct-of-arrays) in session state.
+
+    Budget is a float64 ndarray grown by doubling (NaN = unset); every other field is
+    a list per column. Indexing yields a LeadRow view, so handlers can keep reading and
+    assigning fields as if each lead were a dict.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]] = ()):
+        self.n = 0
+        self.budget = np.full(16, np.nan)
+        self.cols: Dict[str, List[Any]] = {c: [] for c in [*LEAD_COLUMNS, "_email_key"] if c != "Budget"}
+        for row in rows:
+            self.append(row)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, i: int) -> "LeadRow":
+        if not -self.n <= i < self.n:
+            raise IndexError(i)
+        return LeadRow(self, i % self.n)
+
+    def __iter__(self) -> Iterator["LeadRow"]:
+        return (LeadRow(self, i) for i in range(self.n))
+
+    def append(self, lead: Dict[str, Any]) -> "LeadRow":
+        if self.n == len(self.budget):
+            self.budget = np.concatenate([self.budget, np.full(len(self.budget), np.nan)])
+        for col in self.cols.values():
+            col.append(None)
+        self.n += 1
+        row = LeadRow(self, self.n - 1)
+        row.update(lead)
+        return row
+
+    def budgets(self) -> np.ndarray:
+        return self.budget[:self.n]
+
+    def cell(self, i: int, key: str) -> Any:
+        if key == "Budget":
+            v = self.budget[i]
+            return None if np.isnan(v) else float(v)
+        col = self.cols.get(key)
+        return None if col is None else col[i]
+
+    def set_cell(self, i: int, key: str, value: Any):
+        if key == "Budget":
+            self.budget[i] = to_budget(value)
+            return
+        col = self.cols.get(key)
+        if col is None:
+            col = self.cols[key] = [None] * self.n
+        col[i] = value
 
+    def to_df(self) -> pd.DataFrame:
+        data = {c: (self.budgets().copy() if c == "Budget" else self.cols[c][:]) for c in LEAD_COLUMNS}
+        return pd.DataFrame(data, columns=LEAD_COLUMNS)
 
-def save_leads(leads: List[Dict[str, Any]]):
-    LEADS_JSON.write_text(json.dumps(leads, indent=2), encoding="utf-8")
 
+class LeadRow(MutableMapping):
+    """Dict-like view of one LeadTable row; unset (None) fields read as missing."""
 
-def upsert_lead(leads: List[Dict[str, Any]], lead: Dict[str, Any]):
-    idx = next((i for i, x in enumerate(leads) if (x.get("Email") or "").lower() == (lead.get("Email") or "").lower()), None)
+    __slots__ = ("table", "i")
+
+    def __init__(self, table: LeadTable, i: int):
+        self.table, self.i = table, i
+
+    def __getitem__(self, key: str) -> Any:
+        v = self.table.cell(self.i, key)
+        if v is None:
+            raise KeyError(key)
+        return v
+
+    def __setitem__(self, key: str, value: Any):
+        self.table.set_cell(self.i, key, value)
+
+    def __delitem__(self, key: str):
+        self.table.set_cell(self.i, key, None)
+
+    def __iter__(self) -> Iterator[str]:
+        t, i = self.table, self.i
+        if not np.isnan(t.budget[i]):
+            yield "Budget"
+        yield from (k for k, col in t.cols.items() if col[i] is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"LeadRow({dict(self)!r})"
+
+
+def index_leads(leads: LeadTable) -> Dict[str, int]:
+    return {k: i for i, k in enumerate(leads.cols["_email_key"])}
+
+
+def find_lead(leads: LeadTable, index: Dict[str, int], key: str) -> Optional[LeadRow]:
+    """Look up by canonical key; normalise free-text input with email_key() first."""
+    idx = index.get(key)
+    return None if idx is None else leads[idx]
+
+
+def upsert_lead(leads: LeadTable, index: Dict[str, int], lead: Dict[str, Any], now: Optional[str] = None) -> LeadRow:
+    key = lead.setdefault("_email_key", email_key(lead.get("Email")))
+    if not key:
+        raise ValueError("Email is required.")
+    idx = index.get(key)
+    now = now or now_iso()
     lead.setdefault("Status", "New")
-    lead.setdefault("LastActionAt", now_iso())
+    lead.setdefault("LastActionAt", now)
     if idx is None:
-        leads.append(lead)
-    else:
-        # keep status if already beyond New/Updated unless we're resyncing
-        existing = leads[idx]
-        for k, v in lead.items():
-            existing[k] = v
-        if existing.get("Status") in ("New", "Updated"):
-            existing["Status"] = "Updated"
-        existing["LastActionAt"] = now_iso()
+        index[key] = len(leads)
+        return leads.append(lead)
+    existing = leads[idx]
+    if all(existing.get(k) == v for k, v in lead.items() if k not in ("Status", "LastActionAt")):
+        return existing  # identical re-import: keep status/timestamp so the save is a no-op
+    # keep status if already beyond New/Updated unless we're resyncing
+    for k, v in lead.items():
+        existing[k] = v
+    if existing.get("Status") in ("New", "Updated"):
+        existing["Status"] = "Updated"
+    existing["LastActionAt"] = now
+    return existing
 
 
-def as_df(leads: List[Dict[str, Any]]) -> pd.DataFrame:
-    if not leads:
-        return pd.DataFrame(columns=["Name","Email","Company","UseCase","Budget","Phone","Status","ProposalPath","CallTranscript","LastActionAt","Notes"])
-    return pd.DataFrame(leads)
+def as_df(leads: LeadTable) -> pd.DataFrame:
+    if not len(leads):
+        return pd.DataFrame(columns=LEAD_COLUMNS)
+    return leads.to_df()
+
+
+def leads_df(leads: LeadTable) -> pd.DataFrame:
+    """as_df(leads), rebuilt only when the leads revision changes (not on every rerun)."""
+    rev = st.session_state.get("leads_rev", 0)
+    cached = st.session_state.get("leads_df")
+    if cached is None or cached[0] != rev:
+        cached = st.session_state.leads_df = (rev, as_df(leads))
+    return cached[1]
+
+
+def read_leads_csv(src) -> List[Dict[str, Any]]:
+    """Parse an uploaded CSV into lead dicts with column-wise pandas ops; rows without an email are dropped."""
+    try:
+        df = pd.read_csv(src, dtype=str, keep_default_na=False, encoding_errors="ignore")
+    except pd.errors.EmptyDataError:
+        return []
+    df.columns = df.columns.str.strip().str.lower()
+    # Like the old per-row dict, the last of any duplicate (after normalising) headers wins.
+    df = df.loc[:, ~df.columns.duplicated(keep="last")]
+    text_cols = df.select_dtypes(include=["object", "string"]).columns
+    df[text_cols] = df[text_cols].apply(lambda c: c.str.strip())
+    blank = pd.Series("", index=df.index, dtype=object)
+    col = lambda c: df[c] if c in df.columns else blank
+    out = pd.DataFrame({
+        "Name": col("name").where(col("name") != "", col("prospect")),
+        "Email": col("email"),
+        "_email_key": col("email").str.lower(),
+        "Company": col("company"),
+        "UseCase": col("usecase").where(col("usecase") != "", col("automationneed")),
+        # "$12,500" -> 12500.0; blank or unparseable budgets become 0 instead of aborting the import
+        "Budget": pd.to_numeric(col("budget").str.replace(r"[$,]", "", regex=True), errors="coerce").fillna(0.0).astype("float64"),
+        "Phone": col("phone").where(col("phone") != "", None),
+        "Status": "New",
+        "LastActionAt": now_iso(),
+    })
+    out = out[out["Email"] != ""]
+    return out.astype(object).where(out.notna(), None).to_dict("records")
+
+
+OUTBOX_PAGE_SIZE = 200
+
+
+def list_recent(dirpath: Path, ext, n: int = OUTBOX_PAGE_SIZE, offset: int = 0) -> List[str]:
+    """Names in `dirpath` ending with `ext` (str or tuple), reverse-sorted, one page of `n`."""
+    try:
+        with os.scandir(dirpath) as it:
+            names = [e.name for e in it if e.name.endswith(ext)]
+    except FileNotFoundError:
+        return []
+    names.sort(reverse=True)
+    return names[offset:offset + n]
+
+
+# Webhook transcripts that ask for a proposal (one case-insensitive scan).
+_WANT_RE = re.compile(
+    r"send a proposal|yes proposal|email the proposal|want a proposal|please send proposal|\byes\b",
+    re.IGNORECASE,
+)
+
+
+def wants_proposal(transcript: str) -> bool:
+    return _WANT_RE.search(transcript) is not None
 
 
 # -----------------------------
@@ -125,21 +570,135 @@ if LLM_AVAILABLE:
     ])
 
 
-def generate_proposal_md(lead: Dict[str, Any], cfg: Dict[str, Any]) -> str:
+@st.cache_resource(show_spinner=False)
+def get_proposal_chain(model: str, base_url: Optional[str], temperature: float):
+    # One client/runnable per (model, base_url, temperature), shared across reruns and sessions.
+    return PROPOSAL_PROMPT | ChatOllama(model=model, base_url=base_url, temperature=temperature)
+
+
+def _proposal_inputs(lead: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "company": lead.get("Company", "(Company)"),
+        "name": lead.get("Name", "(Name)"),
+        "email": lead.get("Email", ""),
+        "use_case": lead.get("UseCase", lead.get("AutomationNeed", "")),
+        "budget": lead.get("Budget", "N/A"),
+    }
+
+
+def proposal_cache_key(model: str, base_url: Optional[str], inputs: Dict[str, Any]) -> str:
+    blob = orjson.dumps([model, base_url, inputs], option=orjson.OPT_SORT_KEYS, default=str)
+    return hashlib.blake2b(blob, digest_size=16).hexdigest()
+
+
+PROPOSAL_CACHE_SIZE = 256
+
+
+@st.cache_resource(show_spinner=False)
+def _proposal_cache() -> Dict[str, str]:
+    # Exact-match LLM proposals keyed by proposal_cache_key(), shared across reruns and sessions.
+    return {}
+
+
+def _remember_proposal(key: str, text: str):
+    cache = _proposal_cache()
+    cache[key] = text
+    while len(cache) > PROPOSAL_CACHE_SIZE:
+        cache.pop(next(iter(cache)), None)
+
+
+def stream_proposal_md(lead: Dict[str, Any], cfg: Dict[str, Any], result: List[str]) -> Iterator[str]:
+    """Yield the proposal as it is generated (feed to st.write_stream).
+
+    The text to save is appended to `result` once the stream is exhausted. Cached
+    proposals come back as one chunk and only complete generations are cached. If the
+    LLM fails, the template is streamed (after a notice, when partial text was already
+    shown) and only the template is saved.
+    """
     if LLM_AVAILABLE:
+        model, base_url = cfg.get("OLLAMA_MODEL","gemma3"), cfg.get("OLLAMA_BASE_URL")
+        inputs = _proposal_inputs(lead)
+        key = proposal_cache_key(model, base_url, inputs)
+        cached = _proposal_cache().get(key)
+        if cached is not None:
+            result.append(cached)
+            yield cached
+            return
+        chunks: List[str] = []
         try:
-            llm = ChatOllama(model=cfg.get("OLLAMA_MODEL","gemma3"), base_url=cfg.get("OLLAMA_BASE_URL"), temperature=0.3)
-            text = (PROPOSAL_PROMPT | llm).invoke({
-                "company": lead.get("Company", "(Company)"),
-                "name": lead.get("Name", "(Name)"),
-                "email": lead.get("Email", ""),
-                "use_case": lead.get("UseCase", lead.get("AutomationNeed", "")),
-                "budget": lead.get("Budget", "N/A"),
-            }).content
-            return text
+            for chunk in get_proposal_chain(model, base_url, 0.3).stream(inputs):
+                chunks.append(chunk.content)
+                yield chunk.content
         except Exception as e:
             notify(f"LLM unavailable, using template: {e}")
-    # Fallback template
+            if chunks:
+                yield "\n\n---\n\n*Generation interrupted — saving the standard template instead.*\n\n"
+        else:
+            text = "".join(chunks)
+            _remember_proposal(key, text)
+            result.append(text)
+            return
+    template = _template_proposal(lead)
+    result.append(template)
+    yield template
+
+
+def generate_proposal_md(lead: Dict[str, Any], cfg: Dict[str, Any]) -> str:
+    result: List[str] = []
+    for _ in stream_proposal_md(lead, cfg, result):
+        pass
+    return result[0]
+
+
+async def _ollama_chat(client, sem: asyncio.Semaphore, base_url: str, model: str, lead: Dict[str, Any]) -> str:
+    messages = [
+        {"role": "user" if m.type == "human" else m.type, "content": m.content}
+        for m in PROPOSAL_PROMPT.format_messages(**_proposal_inputs(lead))
+    ]
+    async with sem:
+        r = await client.post(f"{base_url}/api/chat", json={
+            "model": model, "messages": messages, "stream": False, "options": {"temperature": 0.3},
+        })
+    r.raise_for_status()
+    return r.json()["message"]["content"]
+
+
+async def _ollama_chat_many(leads: List[LeadRow], cfg: Dict[str, Any]) -> List[Any]:
+    base_url = (cfg.get("OLLAMA_BASE_URL") or DEFAULT_SETTINGS["OLLAMA_BASE_URL"]).rstrip("/")
+    model = cfg.get("OLLAMA_MODEL","gemma3")
+    sem = asyncio.Semaphore(OLLAMA_CONCURRENCY)
+    limits = httpx.Limits(max_connections=OLLAMA_CONCURRENCY)
+    async with httpx.AsyncClient(limits=limits, timeout=httpx.Timeout(300.0)) as client:
+        return await asyncio.gather(*(_ollama_chat(client, sem, base_url, model, l) for l in leads), return_exceptions=True)
+
+
+def generate_proposals_md(leads: List[LeadRow], cfg: Dict[str, Any]) -> List[str]:
+    """Draft proposals for many leads with up to OLLAMA_CONCURRENCY requests in flight.
+
+    Cached proposals are reused; leads whose request fails get the template.
+    """
+    if not leads:
+        return []
+    if not (LLM_AVAILABLE and httpx):
+        return [generate_proposal_md(l, cfg) for l in leads]
+    model, base_url = cfg.get("OLLAMA_MODEL","gemma3"), cfg.get("OLLAMA_BASE_URL")
+    keys = [proposal_cache_key(model, base_url, _proposal_inputs(l)) for l in leads]
+    cache = _proposal_cache()
+    todo = [i for i, k in enumerate(keys) if k not in cache]
+    fetched = dict(zip(todo, asyncio.run(_ollama_chat_many([leads[i] for i in todo], cfg)))) if todo else {}
+    failed = [r for r in fetched.values() if isinstance(r, BaseException)]
+    if failed:
+        notify(f"LLM unavailable for {len(failed)} proposal(s), using template: {failed[0]}")
+    out = []
+    for i, (lead, key) in enumerate(zip(leads, keys)):
+        r = fetched[i] if i in fetched else cache.get(key)
+        if i in fetched and isinstance(r, str):
+            _remember_proposal(key, r)
+        out.append(r if isinstance(r, str) else _template_proposal(lead))
+    return out
+
+
+def _template_proposal(lead: Dict[str, Any]) -> str:
     return (
         f"# Automation Proposal — {lead.get('Company','(Company)')}\n\n"
         f"**Prospect:** {lead.get('Name','')}  \n"
@@ -154,31 +713,37 @@ def generate_proposal_md(lead: Dict[str, Any], cfg: Dict[str, Any]) -> str:
     )
 
 
+_UNSAFE_RE = re.compile(r"[^\w\- ]")
+
+
+def slugify(s: str, max_len: Optional[int] = None) -> str:
+    """Keep word chars, '-' and ' ' (truncated to max_len), then trim and use '_' for spaces."""
+    return _UNSAFE_RE.sub("", s)[:max_len].strip().replace(" ", "_")
+
+
 def save_proposal(company: str, content: str) -> str:
-    safe = "".join(ch for ch in (company or "proposal") if ch.isalnum() or ch in ("_","-"," "))
-    safe = safe.strip().replace(" ", "_") or "proposal"
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe = slugify(company or "proposal") or "proposal"
+    ts = file_ts()
     path = PROPOSALS_DIR / f"{safe}_{ts}.md"
-    path.write_text(content, encoding="utf-8")
-    return str(path)
+    return write_async(path, content.encode("utf-8"))
 
 
 def save_email(to_email: str, subject: str, html: str, attachments: Optional[List[Dict[str,str]]] = None) -> str:
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-    safe_subj = "".join(ch for ch in subject if ch.isalnum() or ch in (" ","-","_"))[:80].strip().replace(" ","_")
+    ts = file_ts()
+    safe_subj = slugify(subject, 80)
     path = EMAIL_DIR / f"{ts}__{to_email}__{safe_subj}.md"
     body = [f"# To: {to_email}", f"# Subject: {subject}", "", html, ""]
     if attachments:
         body.append("## Attachments")
         for att in attachments:
             body.append(f"- {att['filename']} -> {att['path']}")
-    path.write_text("\n".join(body), encoding="utf-8")
+    write_async(path, "\n".join(body).encode("utf-8"))
     notify(f"Email saved: {path.name} -> {to_email}")
     return str(path)
 
 
-def trigger_local_call(lead: Dict[str, Any]) -> str:
-    payload = {
+def call_payload(lead: Dict[str, Any]) -> Dict[str, Any]:
+    return {
         "assistantId": "local-assistant",
         "phoneNumber": lead.get("Phone"),
         "customer": {"name": lead.get("Name"), "email": lead.get("Email"), "company": lead.get("Company")},
@@ -186,22 +751,57 @@ def trigger_local_call(lead: Dict[str, Any]) -> str:
         "webhookUrl": "(local-streamlit)",
         "synthesis": {"prompt": "Friendly sales agent confirming proposal need."},
     }
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def trigger_local_call(lead: Dict[str, Any]) -> str:
+    payload = call_payload(lead)
+    ts = file_ts()
     path = CALL_REQ_DIR / f"call_{lead.get('Email','unknown')}_{ts}.json"
-    Path(path).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    # Single requests stay indented for the Outbox Viewer; batches are compact (see below).
+    write_async(path, orjson.dumps(payload, option=orjson.OPT_INDENT_2))
     notify(f" Simulated call created: {os.path.basename(path)}")
     return str(path)
 
 
-def auto_qualify(lead: Dict[str, Any], threshold: float) -> str:
-    budget = float(lead.get("Budget") or 0)
-    qualified = budget >= threshold
-    status = "Qualified" if qualified else "Unqualified"
-    lead["Status"] = status
-    lead["LastActionAt"] = now_iso()
-    if qualified:
-        trigger_local_call(lead)
-    return status
+def write_call_batch(payloads: List[Dict[str, Any]]) -> Optional[str]:
+    """Write many call requests as one newline-delimited JSON file."""
+    if not payloads:
+        return None
+    ts = file_ts()
+    path = CALL_REQ_DIR / f"call_requests_batch_{ts}.jsonl"
+    with open(path, "wb", buffering=WRITE_BUFFER) as f:
+        f.writelines(orjson.dumps(p, option=orjson.OPT_APPEND_NEWLINE) for p in payloads)
+    notify(f" Simulated calls created: {path.name} ({len(payloads)} requests)")
+    return str(path)
+
+
+def qualify_leads(leads: LeadTable, threshold: float, calls: List[Dict[str, Any]],
+                  now: Optional[str] = None, statuses: Optional[Iterable[str]] = None) -> List[LeadRow]:
+    """Qualify leads by Budget >= threshold with one NumPy compare on the Budget column.
+
+    Only leads whose Status is in `statuses` are considered (all if None), and of those
+    only leads whose Status actually changes are restamped and, if newly qualified, get
+    a call payload queued. Re-running on already-qualified leads is therefore a no-op.
+    The changed leads are returned for saving."""
+    status_col, at_col = leads.cols["Status"], leads.cols["LastActionAt"]
+    if statuses is None:
+        idx = np.arange(len(leads))
+    else:
+        wanted = set(statuses)
+        idx = np.fromiter((i for i in range(len(leads)) if status_col[i] in wanted), dtype=np.intp)
+    mask = np.nan_to_num(leads.budgets()[idx], nan=0.0) >= threshold
+    now = now or now_iso()
+    changed: List[int] = []
+    for i, qualified in zip(idx.tolist(), mask.tolist()):
+        status = "Qualified" if qualified else "Unqualified"
+        if status_col[i] == status:
+            continue
+        status_col[i] = status
+        at_col[i] = now
+        changed.append(i)
+        if qualified:
+            calls.append(call_payload(leads[i]))
+    return [leads[i] for i in changed]
 
 
 # -----------------------------
@@ -213,12 +813,16 @@ st.set_page_config(page_title="Lead Automation (Local)", layout="wide")
 if "settings" not in st.session_state:
     st.session_state.settings = DEFAULT_SETTINGS.copy()
 if "leads" not in st.session_state:
-    st.session_state.leads = load_leads()
+    st.session_state.leads = LeadTable(load_leads())
+if "leads_by_email" not in st.session_state:
+    st.session_state.leads_by_email = index_leads(st.session_state.leads)
 
 settings = st.session_state.settings
 leads = st.session_state.leads
+leads_by_email = st.session_state.leads_by_email
+report_write_errors()
 
-st.title("Lead Qualification & Proposal — Local (No DB, No APIs)")
+st.title("Lead Qualification & Proposal — Local (No DB Server, No APIs)")
 with st.sidebar:
     st.header("Settings")
     settings["OLLAMA_MODEL"] = st.text_input("Ollama Model", settings.get("OLLAMA_MODEL","gemma3"))
@@ -230,8 +834,9 @@ with st.sidebar:
     st.divider()
     st.subheader("Outbox")
     if st.button("Open notifications log"):
+        flush_notifications()
         if NOTIF_LOG.exists():
-            st.code(NOTIF_LOG.read_text(encoding="utf-8")[-4000:], language="text")
+            st.code(NOTIF_LOG.read_bytes()[-4000:].decode("utf-8", errors="ignore"), language="text")
         else:
             st.info("No notifications yet.")
 
@@ -253,55 +858,69 @@ with tabs[0]:
             budget = st.number_input("Budget ($)", min_value=0.0, step=1000.0)
         add = st.button("Save Lead")
         if add:
-            if not email:
+            if not email_key(email):
                 st.error("Email is required.")
             else:
-                upsert_lead(leads, {
+                save_lead(upsert_lead(leads, leads_by_email, {
                     "Name": name, "Email": email, "Company": company, "UseCase": use_case,
                     "Budget": budget, "Phone": phone, "Status": "New", "LastActionAt": now_iso()
-                })
-                save_leads(leads)
+                }))
                 st.success("Lead saved.")
                 st.rerun()
 
-    df = as_df(leads)
+    df = leads_df(leads)
     st.dataframe(df, use_container_width=True)
 
     st.markdown("### Actions")
     c1, c2, c3, c4 = st.columns(4)
     with c1:
         if st.button("Auto-qualify All"):
-            for lead in leads:
-                auto_qualify(lead, settings["QUAL_THRESHOLD"])
-            save_leads(leads)
+            calls: List[Dict[str, Any]] = []
+            with notify_batch():
+                save_leads(qualify_leads(leads, settings["QUAL_THRESHOLD"], calls))
+                write_call_batch(calls)
             st.success("Qualification run complete.")
             st.rerun()
     with c2:
         target = st.text_input("Trigger Call for Email")
         if st.button("Trigger Call"):
-            found = next((x for x in leads if (x.get("Email") or "").lower() == target.lower()), None)
+            found = find_lead(leads, leads_by_email, email_key(target))
             if not found:
                 st.error("Lead not found.")
             else:
                 trigger_local_call(found)
-                save_leads(leads)
+                save_lead(found)
                 st.success("Call request saved to outbox.")
     with c3:
         em = st.text_input("Generate Proposal for Email")
         if st.button("Generate & Save Proposal"):
-            lead = next((x for x in leads if (x.get("Email") or "").lower() == em.lower()), None)
+            lead = find_lead(leads, leads_by_email, email_key(em))
             if not lead:
                 st.error("Lead not found.")
             else:
-                md = generate_proposal_md(lead, settings)
+                result: List[str] = []
+                st.write_stream(stream_proposal_md(lead, settings, result))
+                md = result[0]
                 path = save_proposal(lead.get("Company"), md)
                 lead["ProposalPath"] = path
                 lead["Status"] = "Proposal Sent"
                 save_email(lead.get("Email"), f"{lead.get('Company','Your')} Automation Proposal", "<p>Attached proposal is saved locally.</p>", attachments=[{"filename": os.path.basename(path), "path": path}])
-                save_leads(leads)
+                save_lead(lead)
                 st.success(f"Proposal saved: {path}")
     with c4:
-        st.write("")
+        if st.button("Draft Proposals for Qualified"):
+            targets = [l for l in leads if l.get("Status") == "Qualified"]
+            if not targets:
+                st.info("No qualified leads.")
+            else:
+                with notify_batch():
+                    for lead, md in zip(targets, generate_proposals_md(targets, settings)):
+                        path = save_proposal(lead.get("Company"), md)
+                        lead["ProposalPath"] = path
+                        lead["Status"] = "Proposal Sent"
+                        save_email(lead.get("Email"), f"{lead.get('Company','Your')} Automation Proposal", "<p>Attached proposal is saved locally.</p>", attachments=[{"filename": os.path.basename(path), "path": path}])
+                save_leads(targets)
+                st.success(f"Drafted {len(targets)} proposals.")
 
 # ----- Import CSV -----
 with tabs[1]:
@@ -309,41 +928,28 @@ with tabs[1]:
     st.caption("Headers: Name, Email, Company, UseCase or AutomationNeed, Budget, Phone")
     uploaded = st.file_uploader("Upload CSV", type=["csv"]) 
     if uploaded is not None:
-        content = uploaded.read().decode("utf-8", errors="ignore")
-        reader = csv.DictReader(content.splitlines())
-        count = 0
-        for row in reader:
-            norm = {k.strip().lower(): (v.strip() if isinstance(v, str) else v) for k, v in row.items()}
-            lead = {
-                "Name": norm.get("name") or norm.get("prospect") or "",
-                "Email": norm.get("email") or "",
-                "Company": norm.get("company"),
-                "UseCase": norm.get("usecase") or norm.get("automationneed"),
-                "Budget": float(norm.get("budget") or 0),
-                "Phone": norm.get("phone") or None,
-                "Status": "New",
-                "LastActionAt": now_iso(),
-            }
-            if lead["Email"]:
-                upsert_lead(leads, lead)
-                count += 1
-        save_leads(leads)
-        st.success(f"Imported {count} leads.")
+        now = now_iso()
+        imported = [upsert_lead(leads, leads_by_email, lead, now) for lead in read_leads_csv(uploaded)]
+        save_leads(imported)
+        st.success(f"Imported {len(imported)} leads.")
         if st.button("Auto-qualify imported leads"):
-            for lead in leads:
-                if lead.get("Status") in ("New","Updated"):
-                    auto_qualify(lead, settings["QUAL_THRESHOLD"])
-            save_leads(leads)
+            calls = []
+            with notify_batch():
+                save_leads(qualify_leads(leads, settings["QUAL_THRESHOLD"], calls, statuses=("New","Updated")))
+                write_call_batch(calls)
             st.success("Qualification complete.")
-            st.experimental_rerun()
+            st.rerun()
+
+# Selectbox options for the Calls and Webhook tabs, built once per rerun (canonical lowercased
+# emails) after the Import CSV tab has upserted any uploaded rows.
+email_options = ["-"] + list(leads_by_email)
 
 # ----- Calls -----
 with tabs[2]:
     st.subheader("Calls")
-    emails = [l.get("Email") for l in leads]
-    sel = st.selectbox("Select lead", options=["-"] + emails)
+    sel = st.selectbox("Select lead", options=email_options)
     if sel and sel != "-":
-        lead = next(x for x in leads if x.get("Email") == sel)
+        lead = find_lead(leads, leads_by_email, sel)
         st.write({k: lead.get(k) for k in ["Name","Email","Company","UseCase","Budget","Status"]})
         if st.button("Trigger Simulated Call"):
             trigger_local_call(lead)
@@ -352,14 +958,14 @@ with tabs[2]:
 # ----- Webhook Simulator -----
 with tabs[3]:
     st.subheader("Webhook Simulator (Local)")
-    em = st.selectbox("Lead Email", options=["-"] + [l.get("Email") for l in leads])
+    em = st.selectbox("Lead Email", options=email_options)
     event_type = st.selectbox("Event Type", ["call.completed", "call.transcript_finalized", "call.summary", "call.no_answer", "call.unanswered"]) 
     transcript = st.text_area("Transcript", "Great chat. Please send a proposal.")
     if st.button("Send Event"):
         if em == "-":
             st.error("Select a lead.")
         else:
-            lead = next((x for x in leads if x.get("Email") == em), None)
+            lead = find_lead(leads, leads_by_email, em)
             if not lead:
                 st.error("Lead not found.")
             else:
@@ -370,11 +976,11 @@ with tabs[3]:
                     notify("📪 No answer — follow-up saved. #lead-no-pickup")
                 else:
                     lead["CallTranscript"] = transcript[:15000]
-                    wants = any(kw in transcript.lower() for kw in [
-                        "send a proposal","yes proposal","email the proposal","want a proposal","please send proposal","yes"
-                    ])
+                    wants = wants_proposal(transcript)
                     if wants:
-                        md = generate_proposal_md(lead, settings)
+                        result = []
+                        st.write_stream(stream_proposal_md(lead, settings, result))
+                        md = result[0]
                         path = save_proposal(lead.get("Company"), md)
                         lead["ProposalPath"] = path
                         lead["Status"] = "Proposal Sent"
@@ -383,7 +989,7 @@ with tabs[3]:
                     else:
                         notify(" Call completed; no proposal requested or not detected.")
                 lead["LastActionAt"] = now_iso()
-                save_leads(leads)
+                save_lead(lead)
                 st.success("Event processed.")
 
 # ----- Outbox Viewer -----
@@ -393,27 +999,38 @@ with tabs[4]:
     with col1:
         st.markdown("**Emails**")
         if EMAIL_DIR.exists():
-            files = sorted([p for p in EMAIL_DIR.glob("*.md")], reverse=True)
-            sel = st.selectbox("Select email file", ["-"] + [f.name for f in files])
+            page = st.number_input("Email page", min_value=0, step=1, key="email_page")
+            names = list_recent(EMAIL_DIR, ".md", offset=int(page) * OUTBOX_PAGE_SIZE)
+            sel = st.selectbox("Select email file", ["-"] + names)
             if sel != "-":
-                st.code((EMAIL_DIR/sel).read_text(encoding="utf-8"), language="markdown")
+                wait_for_write(EMAIL_DIR/sel)
+                st.code((EMAIL_DIR/sel).read_bytes().decode("utf-8"), language="markdown")
         else:
             st.info("No emails yet.")
     with col2:
         st.markdown("**Call Requests**")
         if CALL_REQ_DIR.exists():
-            files = sorted([p for p in CALL_REQ_DIR.glob("*.json")], reverse=True)
-            sel2 = st.selectbox("Select call request", ["-"] + [f.name for f in files])
+            page2 = st.number_input("Call request page", min_value=0, step=1, key="call_page")
+            names2 = list_recent(CALL_REQ_DIR, (".json", ".jsonl"), offset=int(page2) * OUTBOX_PAGE_SIZE)
+            sel2 = st.selectbox("Select call request", ["-"] + names2)
             if sel2 != "-":
-                st.code((CALL_REQ_DIR/sel2).read_text(encoding="utf-8"), language="json")
+                wait_for_write(CALL_REQ_DIR/sel2)
+                st.code((CALL_REQ_DIR/sel2).read_bytes().decode("utf-8"), language="json")
         else:
             st.info("No call requests yet.")
 
     st.markdown("**Proposals**")
     if PROPOSALS_DIR.exists():
-        pfiles = sorted([p for p in PROPOSALS_DIR.glob("*.md")], reverse=True)
-        sel3 = st.selectbox("Select proposal", ["-"] + [f.name for f in pfiles])
+        page3 = st.number_input("Proposal page", min_value=0, step=1, key="proposal_page")
+        names3 = list_recent(PROPOSALS_DIR, ".md", offset=int(page3) * OUTBOX_PAGE_SIZE)
+        sel3 = st.selectbox("Select proposal", ["-"] + names3)
         if sel3 != "-":
-            st.code((PROPOSALS_DIR/sel3).read_text(encoding="utf-8"), language="markdown")
+            wait_for_write(PROPOSALS_DIR/sel3)
+            st.code((PROPOSALS_DIR/sel3).read_bytes().decode("utf-8"), language="markdown")
     else:
         st.info("No proposals yet.")
+
+# End of script run: persist buffered notifications once per rerun and surface
+# any background write that has already failed.
+flush_notifications()
+report_write_errors()
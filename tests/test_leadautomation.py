@@ -0,0 +1,31 @@
+import shutil
+from pathlib import Path
+
+import orjson
+import pytest
+
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+APP = Path(__file__).resolve().parents[1] / "leadautomation.py"
+
+
+def _app(tmp_path: Path) -> AppTest:
+    return AppTest.from_file(str(tmp_path / "app.py"), default_timeout=30)
+
+
+def test_legacy_blank_budget_loads(tmp_path):
+    shutil.copy(APP, tmp_path / "app.py")
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "leads.json").write_bytes(orjson.dumps([
+        {"Name": "Ann", "Email": "ann@x.com", "Budget": "", "Status": "New"},
+        {"Name": "Bob", "Email": "bob@x.com", "Budget": "7,500", "Status": "New"},
+    ]))
+
+    # First start imports leads.json into leads.db; the second reads it back from SQLite.
+    for _ in range(2):
+        at = _app(tmp_path).run()
+        assert not at.exception, at.exception
+        df = at.dataframe[0].value
+        assert list(df["Email"]) == ["ann@x.com", "bob@x.com"]
+        assert df["Budget"].isna().tolist() == [True, False]
+        assert df["Budget"].iloc[1] == 7500.0